@@ -1,14 +1,19 @@
 import pandas as pd
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.neighbors import BallTree
 import uuid 
 from datetime import datetime, timedelta
 import numpy as np 
 import joblib # Import joblib for model persistence
 import os # Import os for path checking
-from math import radians, sin, cos, sqrt, atan2
+import threading # Guards the incrementally maintained hotspot grid
+import json
+from collections import Counter
+from math import radians, sin, cos, sqrt, atan2, floor, ceil, isfinite
+from preprocessing import NORTHEAST_STATES, clean_survey_data, disease_risk_mapping, exceeded_contaminants, label_samples, survey_arrow_table
 
 app = Flask(__name__)
 CORS(app)
@@ -17,6 +22,11 @@ CORS(app)
 processed_data_df = pd.DataFrame()
 ml_model = None
 model_features = []
+hotspot_grid = None # Incremental spatial clustering of unsafe samples, see HotspotGrid
+safe_sources = [] # Villages with no unsafe samples, in BallTree row order
+safe_source_tree = None # Haversine BallTree over safe_sources coordinates
+EARTH_RADIUS_KM = 6371
+EXPORT_CHUNK_ROWS = 5000 # Rows serialised per streamed chunk / Parquet row group
 MODEL_PATH = 'model.joblib' # Path to save/load the trained model
 
 # Helper function to convert NaN to None for JSON serialization
@@ -31,7 +41,7 @@ def convert_nan_to_none(obj):
 
 # Haversine distance function
 def haversine_distance(lat1, lon1, lat2, lon2):
-    R = 6371  # Radius of Earth in kilometers
+    R = EARTH_RADIUS_KM
 
     lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
 
@@ -44,73 +54,200 @@ def haversine_distance(lat1, lon1, lat2, lon2):
     distance = R * c
     return distance
 
-# List of Northeast Indian states for filtering
-NORTHEAST_STATES = [
-    "Arunachal Pradesh", "Assam", "Manipur", "Meghalaya", 
-    "Mizoram", "Nagaland", "Sikkim", "Tripura"
-]
+# Vectorised haversine distance from one point to arrays of coordinates
+def haversine_distance_array(lat, lon, lats, lons):
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(np.asarray(lats, dtype=float)), np.radians(np.asarray(lons, dtype=float))
+
+    a = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2)**2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+# --- Hotspot Detection ---
+KM_PER_DEGREE_LAT = 111.32
+
+class HotspotGrid:
+    """
+    Incremental density-based (DBSCAN-style) clustering of unsafe samples.
+
+    Points are bucketed into grid cells roughly eps_km wide, so a neighbourhood
+    query only inspects the surrounding cells instead of every sample. Clusters
+    are kept in a union-find over core points, and per-cluster aggregates are
+    merged on union, so adding a sample costs a few cell lookups and reading
+    the hotspots costs O(number of clusters).
+
+    The backend has no ingestion endpoint yet, so today the grid is only seeded
+    from the survey workbook at load time. add_sample is the hook a future
+    ingestion path should call; the lock keeps it safe alongside reads.
+    """
+
+    def __init__(self, eps_km=5.0, min_samples=3):
+        self.eps_km = eps_km
+        self.min_samples = min_samples
+        self.cell_deg = eps_km / KM_PER_DEGREE_LAT
+        self.cells = {}            # (row, col) -> list of point ids
+        self.points = []           # point id -> (lat, lon)
+        self.samples = []          # point id -> per-sample attributes
+        self.neighbour_counts = [] # point id -> points within eps_km, itself included
+        self.is_core = []
+        self.assigned = []         # point id -> counted in some cluster (core or border)
+        self.parent = []           # union-find parent; border points point at their cluster
+        self.clusters = {}         # root id -> aggregate
+        self.lock = threading.Lock()
+
+    def _cell(self, lat, lon):
+        return (floor(lat / self.cell_deg), floor(lon / self.cell_deg))
+
+    def _neighbours(self, lat, lon):
+        row, col = self._cell(lat, lon)
+        # Longitude degrees shrink towards the poles, so scan more columns there
+        lon_span = ceil(1 / max(cos(radians(min(abs(lat) + self.cell_deg, 89.0))), 1e-6))
+        for d_row in (-1, 0, 1):
+            for d_col in range(-lon_span, lon_span + 1):
+                for idx in self.cells.get((row + d_row, col + d_col), ()):
+                    p_lat, p_lon = self.points[idx]
+                    if haversine_distance(lat, lon, p_lat, p_lon) <= self.eps_km:
+                        yield idx
+
+    def _find(self, idx):
+        root = idx
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[idx] != root:
+            self.parent[idx], idx = root, self.parent[idx]
+        return root
+
+    def _new_cluster(self, idx):
+        lat, lon = self.points[idx]
+        sample = self.samples[idx]
+        self.clusters[idx] = {
+            "count": 1,
+            "min_lat": lat, "max_lat": lat,
+            "min_lon": lon, "max_lon": lon,
+            "sum_lat": lat, "sum_lon": lon,
+            "exceeded": Counter([sample["exceeded"]]),
+            "contaminants": Counter(sample["contaminants"]),
+            "villages": Counter([sample["village"]]),
+        }
+        self.parent[idx] = idx
+        self.assigned[idx] = True
+
+    def _add_to_cluster(self, idx, root):
+        lat, lon = self.points[idx]
+        sample = self.samples[idx]
+        cluster = self.clusters[root]
+        cluster["count"] += 1
+        cluster["min_lat"] = min(cluster["min_lat"], lat)
+        cluster["max_lat"] = max(cluster["max_lat"], lat)
+        cluster["min_lon"] = min(cluster["min_lon"], lon)
+        cluster["max_lon"] = max(cluster["max_lon"], lon)
+        cluster["sum_lat"] += lat
+        cluster["sum_lon"] += lon
+        cluster["exceeded"][sample["exceeded"]] += 1
+        cluster["contaminants"].update(sample["contaminants"])
+        cluster["villages"][sample["village"]] += 1
+        self.parent[idx] = root
+        self.assigned[idx] = True
+
+    def _union(self, a, b):
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a == root_b:
+            return
+        # Merge the smaller aggregate into the larger one
+        if self.clusters[root_a]["count"] < self.clusters[root_b]["count"]:
+            root_a, root_b = root_b, root_a
+        small = self.clusters.pop(root_b)
+        big = self.clusters[root_a]
+        big["count"] += small["count"]
+        big["min_lat"] = min(big["min_lat"], small["min_lat"])
+        big["max_lat"] = max(big["max_lat"], small["max_lat"])
+        big["min_lon"] = min(big["min_lon"], small["min_lon"])
+        big["max_lon"] = max(big["max_lon"], small["max_lon"])
+        big["sum_lat"] += small["sum_lat"]
+        big["sum_lon"] += small["sum_lon"]
+        big["exceeded"].update(small["exceeded"])
+        big["contaminants"].update(small["contaminants"])
+        big["villages"].update(small["villages"])
+        self.parent[root_b] = root_a
+
+    def _promote_to_core(self, idx, neighbours):
+        self.is_core[idx] = True
+        if not self.assigned[idx]:
+            self._new_cluster(idx)
+        # A former border point already sits in its cluster's aggregate; hanging
+        # it off that root as a core point keeps the counts intact.
+        for other in neighbours:
+            if self.is_core[other]:
+                self._union(idx, other)
+            elif not self.assigned[other]:
+                self._add_to_cluster(other, self._find(idx))
+
+    def add_sample(self, lat, lon, village, contaminants):
+        exceeded = '3+' if len(contaminants) >= 3 else str(len(contaminants))
+        with self.lock:
+            idx = len(self.points)
+            neighbours = list(self._neighbours(lat, lon))
+            self.points.append((lat, lon))
+            self.samples.append({"village": village, "contaminants": contaminants, "exceeded": exceeded})
+            self.neighbour_counts.append(len(neighbours) + 1)
+            self.is_core.append(False)
+            self.assigned.append(False)
+            self.parent.append(idx)
+            self.cells.setdefault(self._cell(lat, lon), []).append(idx)
+
+            for other in neighbours:
+                self.neighbour_counts[other] += 1
+
+            for candidate in neighbours + [idx]:
+                if not self.is_core[candidate] and self.neighbour_counts[candidate] >= self.min_samples:
+                    if candidate == idx:
+                        candidate_neighbours = neighbours
+                    else:
+                        c_lat, c_lon = self.points[candidate]
+                        candidate_neighbours = [n for n in self._neighbours(c_lat, c_lon) if n != candidate]
+                    self._promote_to_core(candidate, candidate_neighbours)
+
+            # A non-core sample next to an existing core point becomes a border point
+            if not self.assigned[idx]:
+                for other in neighbours:
+                    if self.is_core[other]:
+                        self._add_to_cluster(idx, self._find(other))
+                        break
+
+    def add_samples(self, df):
+        for _, row in df.iterrows():
+            self.add_sample(row["Latitude"], row["Longitude"], row["Location"], exceeded_contaminants(row))
+
+    def hotspots(self):
+        """Current clusters; contaminantsExceeded counts samples by how many safe limits ('1', '2', '3+') they breach."""
+        with self.lock:
+            snapshot = []
+            for root, cluster in self.clusters.items():
+                count = cluster["count"]
+                snapshot.append({
+                    "id": f"hotspot-{root}",
+                    "centroid": [cluster["sum_lat"] / count, cluster["sum_lon"] / count],
+                    "bounds": [[cluster["min_lat"], cluster["min_lon"]], [cluster["max_lat"], cluster["max_lon"]]],
+                    "sampleCount": count,
+                    "contaminantsExceeded": {bucket: cluster["exceeded"].get(bucket, 0) for bucket in ('3+', '2', '1')},
+                    "dominantContaminant": cluster["contaminants"].most_common(1)[0][0] if cluster["contaminants"] else None,
+                    "contaminantCounts": dict(cluster["contaminants"]),
+                    "villages": [village for village, _ in cluster["villages"].most_common()],
+                })
+            return snapshot
 
 # --- Data Loading, Preprocessing, and Model Training/Loading ---
 def load_and_preprocess_data_and_train_model():
-    global processed_data_df, ml_model, model_features
+    global processed_data_df, ml_model, model_features, hotspot_grid, safe_sources, safe_source_tree
     try:
         # Load and preprocess data
         df = pd.read_excel("../final_nhs-wq_pre_2023_compressed.xlsx")
         
-        cols_to_fix = ["NO3", "As (ppb)", "Fe (ppm)", "Total Hardness", "pH", "EC (µS/cm at"]
-        all_numeric_cols = cols_to_fix + ['Latitude', 'Longitude']
-
-        # Pre-clean Latitude and Longitude columns to remove non-numeric characters (e.g., backticks)
-        if 'Latitude' in df.columns:
-            df['Latitude'] = df['Latitude'].astype(str).str.replace(r'[^0-9.-]', '', regex=True)
-        if 'Longitude' in df.columns:
-            df['Longitude'] = df['Longitude'].astype(str).str.replace(r'[^0-9.-]', '', regex=True)
-
-        for col in all_numeric_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors="coerce")
-        
-        # Fill NaNs in all relevant numeric columns with their median
-        df[all_numeric_cols] = df[all_numeric_cols].fillna(df[all_numeric_cols].median())
-        
-        # Ensure 'Location' is a string type and fill any NaN with a placeholder or None
-        df['Location'] = df['Location'].fillna('Unknown Location').astype(str)
+        df = clean_survey_data(df)
 
         # Filter data for Northeast states only
-        df = df[df['State'].isin(NORTHEAST_STATES)]
-
-        def water_quality_label(row):
-            if (
-                row["NO3"] > 45 or
-                row["As (ppb)"] > 10 or
-                row["Fe (ppm)"] > 0.3 or
-                row["Total Hardness"] > 300 or
-                row["pH"] < 6.5 or row["pH"] > 8.5 or
-                row["EC (µS/cm at"] > 1500
-            ):
-                return 1   # Unsafe
-            else:
-                return 0   # Safe
-
-        df["WaterQuality_Label"] = df.apply(water_quality_label, axis=1)
-
-        def disease_risk_mapping(row):
-            risks = []
-            if row["NO3"] > 45:
-                risks.append("Blue Baby Syndrome (Methemoglobinemia)")
-            if row["As (ppb)"] > 10:
-                risks.append("Arsenic Poisoning (Skin, Cancer risk)")
-            if row["Fe (ppm)"] > 0.3:
-                risks.append("Stomach Issues / Teeth Staining")
-            if row["Total Hardness"] > 300:
-                risks.append("Hair Fall, Kidney Stones")
-            if row["pH"] < 6.5 or row["pH"] > 8.5:
-                risks.append("Diarrhea, Stomach Irritation")
-            if row["EC (µS/cm at"] > 1500:
-                risks.append("Hypertension Risk (High Salinity)")
-            return ", ".join(risks) if risks else "Safe"
-
-        df["Possible_Diseases"] = df.apply(disease_risk_mapping, axis=1)
+        df = df[df['State'].isin(NORTHEAST_STATES)].copy()
+
+        df = label_samples(df)
 
         # --- Model Loading/Training ---
         # Prepare data for model training (if needed)
@@ -136,6 +273,25 @@ def load_and_preprocess_data_and_train_model():
 
         processed_data_df = df
 
+        # Seed the hotspot grid with the unsafe samples (the only rows the backend has today)
+        hotspot_grid = HotspotGrid()
+        hotspot_grid.add_samples(df[df["WaterQuality_Label"] == 1])
+
+        # Index villages where every sample is safe for nearest-safe-source lookups
+        # Same-named villages in different districts are separate places, so key on all three
+        village_coords = df.groupby(["State", "District", "Location"]).agg(
+            Latitude=("Latitude", "mean"),
+            Longitude=("Longitude", "mean"),
+            unsafe=("WaterQuality_Label", "max"),
+            samples=("WaterQuality_Label", "size"),
+        )
+        village_coords = village_coords[village_coords["unsafe"] == 0]
+        safe_sources = [
+            {"id": str(uuid.uuid4()), "name": location, "district": district, "state": state, "coordinates": [row["Latitude"], row["Longitude"]], "sampleCount": int(row["samples"])}
+            for (state, district, location), row in village_coords.iterrows()
+        ]
+        safe_source_tree = BallTree(np.radians(village_coords[["Latitude", "Longitude"]].to_numpy()), metric="haversine") if safe_sources else None
+
     except Exception as e:
         print(f"Error loading, preprocessing data, or training/loading model: {e}")
 
@@ -457,6 +613,245 @@ def get_chart_data():
     return jsonify(convert_nan_to_none(chart_data))
 
 
+@app.route('/api/hotspots')
+def get_hotspots():
+    if processed_data_df.empty or hotspot_grid is None:
+        return jsonify([]), 200
+
+    # Get proximity parameters
+    lat = request.args.get('latitude', type=float)
+    lon = request.args.get('longitude', type=float)
+    radius_km = request.args.get('radius_km', type=float)
+    limit = request.args.get('limit', type=int)
+
+    print(f"API /hotspots received: lat={lat}, lon={lon}, radius_km={radius_km}, limit={limit}")
+
+    hotspots_list = hotspot_grid.hotspots()
+    print(f"API /hotspots: Clusters before proximity filter: {len(hotspots_list)}")
+    if lat is not None and lon is not None:
+        for hotspot in hotspots_list:
+            hotspot["distance"] = haversine_distance(lat, lon, hotspot["centroid"][0], hotspot["centroid"][1])
+        if radius_km is not None:
+            hotspots_list = [hotspot for hotspot in hotspots_list if hotspot["distance"] <= radius_km]
+    print(f"API /hotspots: Clusters after proximity filter: {len(hotspots_list)}")
+
+    # Sort hotspots: largest first, then by samples breaching 3+ limits, then by distance if known
+    hotspots_list.sort(key=lambda x: (-x['sampleCount'], -x['contaminantsExceeded']['3+'], x.get('distance', 0)))
+
+    if limit:
+        hotspots_list = hotspots_list[:limit]
+    print(f"API /hotspots: Clusters after limit: {len(hotspots_list)}")
+
+    return jsonify(convert_nan_to_none(hotspots_list))
+
+
+# True when lat/lon are finite and within the valid degree ranges
+def valid_coordinates(lat, lon):
+    return isfinite(lat) and isfinite(lon) and abs(lat) <= 90 and abs(lon) <= 180
+
+# Returns the k nearest safe sources for each (lat, lon) query point
+def nearest_safe_sources(points, k):
+    if safe_source_tree is None:
+        return [{"query": [lat, lon], "neighbours": []} for lat, lon in points]
+    k = min(k, len(safe_sources))
+    distances, indices = safe_source_tree.query(np.radians(np.asarray(points, dtype=float)), k=k)
+    results = []
+    for (lat, lon), row_distances, row_indices in zip(points, distances, indices):
+        neighbours = []
+        for distance, idx in zip(row_distances, row_indices):
+            source = safe_sources[idx]
+            neighbours.append({
+                "id": source["id"],
+                "name": source["name"],
+                "district": source["district"],
+                "state": source["state"],
+                "type": "aggregated",
+                "coordinates": source["coordinates"],
+                "status": "safe",
+                "sampleCount": source["sampleCount"],
+                "distance": float(distance) * EARTH_RADIUS_KM
+            })
+        results.append({"query": [lat, lon], "neighbours": neighbours})
+    return results
+
+@app.route('/api/nearest-safe', methods=['GET', 'POST'])
+def get_nearest_safe():
+    if request.method == 'POST':
+        # Batch lookup: {"points": [[lat, lon], ...] or [{"lat": .., "lon": ..}, ...], "k": ..}
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not isinstance(data.get('points'), list) or not data['points']:
+            return jsonify(error="A non-empty 'points' list is required"), 400
+        try:
+            points = [
+                (float(p['lat']), float(p['lon'])) if isinstance(p, dict) else (float(p[0]), float(p[1]))
+                for p in data['points']
+            ]
+        except (KeyError, IndexError, TypeError, ValueError):
+            return jsonify(error="Each point needs a lat and lon"), 400
+        k = data.get('k', 5)
+        # bool is a subclass of int, and floats would be silently truncated
+        if isinstance(k, bool) or not isinstance(k, int):
+            return jsonify(error="k must be an integer"), 400
+    else:
+        lat = request.args.get('lat', type=float)
+        lon = request.args.get('lon', type=float)
+        if lat is None or lon is None:
+            return jsonify(error="lat and lon are required"), 400
+        points = [(lat, lon)]
+        try:
+            k = int(request.args.get('k', default='5'))
+        except ValueError:
+            return jsonify(error="k must be an integer"), 400
+
+    if not all(valid_coordinates(lat, lon) for lat, lon in points):
+        return jsonify(error="lat must be within [-90, 90] and lon within [-180, 180]"), 400
+
+    if k < 1:
+        return jsonify(error="k must be at least 1"), 400
+
+    print(f"API /nearest-safe received: points={len(points)}, k={k}")
+
+    results = nearest_safe_sources(points, k)
+
+    if request.method == 'POST':
+        return jsonify(convert_nan_to_none(results))
+    return jsonify(convert_nan_to_none(results[0]["neighbours"]))
+
+
+# File-like sink that hands back whatever has been written since the last drain
+class StreamBuffer:
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+# Yields filtered slices of the processed data, EXPORT_CHUNK_ROWS rows at a time
+def iter_export_chunks(df, lat, lon, radius_km, state, year_from, year_to):
+    for start in range(0, len(df), EXPORT_CHUNK_ROWS):
+        chunk = df.iloc[start:start + EXPORT_CHUNK_ROWS]
+        mask = np.ones(len(chunk), dtype=bool)
+        if state:
+            mask &= (chunk["State"].str.lower() == state.lower()).to_numpy()
+        if year_from is not None:
+            mask &= (chunk["Year"] >= year_from).to_numpy()
+        if year_to is not None:
+            mask &= (chunk["Year"] <= year_to).to_numpy()
+        distances = None
+        if lat is not None and lon is not None and radius_km is not None:
+            distances = haversine_distance_array(lat, lon, chunk["Latitude"], chunk["Longitude"])
+            mask &= distances <= radius_km
+        if not mask.any():
+            continue
+        chunk = chunk[mask]
+        if distances is not None:
+            chunk = chunk.assign(distance=distances[mask])
+        yield chunk
+
+def stream_csv(chunks, template):
+    header = True
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=header)
+        header = False
+    if header:
+        # Nothing matched: still emit the header row
+        yield template.to_csv(index=False)
+
+def stream_geojson(chunks):
+    yield '{"type": "FeatureCollection", "features": ['
+    first = True
+    for chunk in chunks:
+        properties = json.loads(chunk.drop(columns=["Latitude", "Longitude"]).to_json(orient="records"))
+        features = []
+        for props, lat, lon in zip(properties, chunk["Latitude"], chunk["Longitude"]):
+            features.append(json.dumps({
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [lon, lat]},
+                "properties": props
+            }))
+        yield ("" if first else ",") + ",".join(features)
+        first = False
+    yield "]}"
+
+def stream_parquet(chunks, pq, template):
+    # The processed data is fully loaded, so its numeric dtypes hold for every chunk
+    float_columns = template.select_dtypes(include='float').columns.tolist()
+    int_columns = template.select_dtypes(include='integer').columns.tolist()
+    schema = survey_arrow_table(template, float_columns, int_columns).schema
+    sink = StreamBuffer()
+    # Opening the writer up front means an export with no matches is still a valid file with the same schema
+    writer = pq.ParquetWriter(sink, schema)
+    for chunk in chunks:
+        writer.write_table(survey_arrow_table(chunk, float_columns, int_columns))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+@app.route('/api/export')
+def export_data():
+    if processed_data_df.empty:
+        return jsonify(error="Data not processed"), 500
+
+    export_format = request.args.get('format', default='csv').lower()
+
+    # Get proximity parameters
+    lat = request.args.get('latitude', type=float)
+    lon = request.args.get('longitude', type=float)
+    radius_km = request.args.get('radius_km', type=float)
+    # Get state and time filters
+    state = request.args.get('state')
+    year_from = request.args.get('year_from', type=int)
+    year_to = request.args.get('year_to', type=int)
+
+    print(f"API /export received: format={export_format}, lat={lat}, lon={lon}, radius_km={radius_km}, state={state}, year_from={year_from}, year_to={year_to}")
+
+    df = processed_data_df
+    chunks = iter_export_chunks(df, lat, lon, radius_km, state, year_from, year_to)
+    # Empty frame with the export's columns and dtypes, used when no rows match
+    template = df.iloc[:0]
+    if lat is not None and lon is not None and radius_km is not None:
+        template = template.assign(distance=pd.Series(dtype="float64"))
+
+    if export_format == 'csv':
+        body, mimetype = stream_csv(chunks, template), 'text/csv'
+    elif export_format == 'geojson':
+        body, mimetype = stream_geojson(chunks), 'application/geo+json'
+    elif export_format == 'parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            print(f"Import error: {e}")
+            return jsonify(error=f"Parquet export requires pyarrow: {str(e)}"), 500
+        body, mimetype = stream_parquet(chunks, pq, template), 'application/vnd.apache.parquet'
+    else:
+        return jsonify(error="format must be one of csv, parquet, geojson"), 400
+
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=jalrakshak_export.{export_format}"}
+    )
+
+
 @app.route('/predict', methods=['POST'])
 def predict():
     if ml_model is None or processed_data_df.empty:
@@ -0,0 +1,180 @@
+"""
+Batch scorer for whole survey files.
+
+Labels, model predictions and disease flags are added to every sample of a
+survey file laid out like final_nhs-wq_pre_2023_compressed.xlsx, using the same
+cleaning and labelling as the API. The input is read in chunks, scored across a
+process pool and written out incrementally, so memory stays flat however large
+the file is.
+
+Usage:
+    python batch_score.py new_survey.xlsx scored.parquet --workers 8
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from itertools import chain
+from multiprocessing import Pool
+
+import joblib
+import pandas as pd
+
+from preprocessing import NUMERIC_COLUMNS, clean_survey_data, label_samples, survey_arrow_table
+
+MODEL_PATH = 'model.joblib'
+REFERENCE_PATH = '../final_nhs-wq_pre_2023_compressed.xlsx'
+
+# Set in each worker by init_worker
+worker_model = None
+worker_features = []
+worker_fill_values = None
+
+def reference_fill_values(reference_path, features):
+    """Medians of the training workbook, used to fill gaps the same way the API did at training time."""
+    reference_df = clean_survey_data(pd.read_excel(reference_path))
+    columns = list(dict.fromkeys(NUMERIC_COLUMNS + list(features)))
+    return reference_df.reindex(columns=columns).apply(pd.to_numeric, errors="coerce").median()
+
+def init_worker(model, fill_values):
+    global worker_model, worker_features, worker_fill_values
+    worker_model = model
+    worker_features = list(model.feature_names_in_)
+    worker_fill_values = fill_values
+
+def score_chunk(chunk):
+    chunk = clean_survey_data(chunk, fill_values=worker_fill_values[NUMERIC_COLUMNS])
+    chunk = label_samples(chunk)
+
+    features = chunk.reindex(columns=worker_features).apply(pd.to_numeric, errors="coerce")
+    features = features.fillna(worker_fill_values[worker_features])
+    chunk["Predicted_Label"] = worker_model.predict(features).astype("int64")
+    if len(worker_model.classes_) == 2:
+        chunk["Unsafe_Probability"] = worker_model.predict_proba(features)[:, 1]
+    return chunk
+
+def read_chunks(path, chunk_size):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    elif extension == '.parquet':
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    elif extension in ('.xlsx', '.xlsm'):
+        # pandas cannot read Excel in chunks, so stream rows with openpyxl's read-only mode
+        from openpyxl import load_workbook
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(col) for col in next(rows)]
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= chunk_size:
+                    yield pd.DataFrame(batch, columns=header)
+                    batch = []
+            if batch:
+                yield pd.DataFrame(batch, columns=header)
+        finally:
+            workbook.close()
+    else:
+        raise ValueError(f"Unsupported input format '{extension}', expected .csv, .xlsx or .parquet")
+
+# Columns clean_survey_data needs; anything else in the sheet is carried through untouched
+REQUIRED_COLUMNS = NUMERIC_COLUMNS + ['Location']
+
+def check_survey_columns(chunk):
+    missing = [col for col in REQUIRED_COLUMNS if col not in chunk.columns]
+    if missing:
+        raise ValueError(f"Input is not in the survey layout, missing columns: {', '.join(missing)}")
+
+class ChunkWriter:
+    def __init__(self, path):
+        self.path = path
+        self.extension = os.path.splitext(path)[1].lower()
+        if self.extension not in ('.csv', '.parquet'):
+            raise ValueError(f"Unsupported output format '{self.extension}', expected .csv or .parquet")
+        self.parquet_writer = None
+        self.header_written = False
+
+    def write(self, chunk):
+        if self.extension == '.csv':
+            chunk.to_csv(self.path, mode='a' if self.header_written else 'w', header=not self.header_written, index=False)
+            self.header_written = True
+            return
+
+        import pyarrow.parquet as pq
+        table = survey_arrow_table(chunk, float_columns=["Unsafe_Probability"], int_columns=["Predicted_Label"])
+        if self.parquet_writer is None:
+            self.parquet_writer = pq.ParquetWriter(self.path, table.schema)
+        self.parquet_writer.write_table(table)
+
+    def close(self):
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+
+def run(input_path, output_path, model_path, reference_path, workers, chunk_size):
+    # Validates the output format before the slow model and reference loads
+    writer = ChunkWriter(output_path)
+
+    # Read the first chunk up front so an unreadable or wrongly laid out input fails before any scoring
+    chunks = read_chunks(input_path, chunk_size)
+    first_chunk = next(chunks, None)
+    if first_chunk is not None:
+        check_survey_columns(first_chunk)
+        chunks = chain([first_chunk], chunks)
+
+    model = joblib.load(model_path)
+    fill_values = reference_fill_values(reference_path, model.feature_names_in_)
+
+    rows_done = 0
+    unsafe = 0
+    start = time.time()
+    # Bound the chunks in flight so reading never runs far ahead of scoring
+    max_in_flight = workers * 2
+
+    def write_result(result):
+        nonlocal rows_done, unsafe
+        writer.write(result)
+        rows_done += len(result)
+        unsafe += int(result["WaterQuality_Label"].sum())
+        elapsed = time.time() - start
+        print(f"Scored {rows_done:,} rows ({unsafe:,} unsafe) in {elapsed:.1f}s, {rows_done / max(elapsed, 1e-9):,.0f} rows/s", flush=True)
+
+    try:
+        # With the fork start method the workers inherit the model loaded above and
+        # share its tree arrays copy-on-write; spawn-based platforms pickle a copy instead
+        with Pool(processes=workers, initializer=init_worker, initargs=(model, fill_values)) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.apply_async(score_chunk, (chunk,)))
+                if len(pending) >= max_in_flight:
+                    write_result(pending.popleft().get())
+            while pending:
+                write_result(pending.popleft().get())
+    finally:
+        writer.close()
+
+    print(f"Wrote {rows_done:,} scored rows to {output_path}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a whole water quality survey file with labels, model predictions and disease flags.")
+    parser.add_argument("input", help="Survey file to score (.csv, .xlsx or .parquet)")
+    parser.add_argument("output", help="Where to write the scored rows (.csv or .parquet)")
+    parser.add_argument("--model", default=MODEL_PATH, help=f"Trained model (default: {MODEL_PATH})")
+    parser.add_argument("--reference", default=REFERENCE_PATH, help="Training workbook whose medians fill missing values")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Number of scoring processes")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Rows per chunk")
+    args = parser.parse_args(argv)
+
+    try:
+        run(args.input, args.output, args.model, args.reference, args.workers, args.chunk_size)
+    except (OSError, ValueError) as e:
+        print(f"Error scoring {args.input}: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
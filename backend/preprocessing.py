@@ -0,0 +1,113 @@
+import pandas as pd
+
+# Contaminant columns checked against safe drinking water limits
+CONTAMINANT_COLUMNS = ["NO3", "As (ppb)", "Fe (ppm)", "Total Hardness", "pH", "EC (µS/cm at"]
+NUMERIC_COLUMNS = CONTAMINANT_COLUMNS + ['Latitude', 'Longitude']
+
+# Health risk associated with breaching each contaminant's safe limit
+DISEASE_RISKS = {
+    "NO3": "Blue Baby Syndrome (Methemoglobinemia)",
+    "As (ppb)": "Arsenic Poisoning (Skin, Cancer risk)",
+    "Fe (ppm)": "Stomach Issues / Teeth Staining",
+    "Total Hardness": "Hair Fall, Kidney Stones",
+    "pH": "Diarrhea, Stomach Irritation",
+    "EC (µS/cm at": "Hypertension Risk (High Salinity)",
+}
+
+# List of Northeast Indian states for filtering
+NORTHEAST_STATES = [
+    "Arunachal Pradesh", "Assam", "Manipur", "Meghalaya",
+    "Mizoram", "Nagaland", "Sikkim", "Tripura"
+]
+
+def clean_survey_data(df, fill_values=None):
+    """
+    Coerce the contaminant and coordinate columns of a survey sheet to numbers.
+
+    Missing values are filled from fill_values when given (e.g. medians of the
+    training workbook), otherwise from the medians of df itself.
+    """
+    # Pre-clean Latitude and Longitude columns to remove non-numeric characters (e.g., backticks)
+    if 'Latitude' in df.columns:
+        df['Latitude'] = df['Latitude'].astype(str).str.replace(r'[^0-9.-]', '', regex=True)
+    if 'Longitude' in df.columns:
+        df['Longitude'] = df['Longitude'].astype(str).str.replace(r'[^0-9.-]', '', regex=True)
+
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    # Fill NaNs in all relevant numeric columns with their median
+    if fill_values is None:
+        fill_values = df[NUMERIC_COLUMNS].median()
+    df[NUMERIC_COLUMNS] = df[NUMERIC_COLUMNS].fillna(fill_values)
+
+    # Ensure 'Location' is a string type and fill any NaN with a placeholder or None
+    df['Location'] = df['Location'].fillna('Unknown Location').astype(str)
+    return df
+
+# Safe-limit breaches per contaminant; works on a single row or a whole DataFrame
+def contaminant_flags(data):
+    return {
+        "NO3": data["NO3"] > 45,
+        "As (ppb)": data["As (ppb)"] > 10,
+        "Fe (ppm)": data["Fe (ppm)"] > 0.3,
+        "Total Hardness": data["Total Hardness"] > 300,
+        "pH": (data["pH"] < 6.5) | (data["pH"] > 8.5),
+        "EC (µS/cm at": data["EC (µS/cm at"] > 1500,
+    }
+
+# Returns the contaminant columns whose safe limits are breached by a sample
+def exceeded_contaminants(row):
+    return [col for col, exceeded in contaminant_flags(row).items() if exceeded]
+
+def water_quality_label(row):
+    return 1 if exceeded_contaminants(row) else 0  # 1 = Unsafe, 0 = Safe
+
+def disease_risk_mapping(row):
+    risks = [DISEASE_RISKS[col] for col in exceeded_contaminants(row)]
+    return ", ".join(risks) if risks else "Safe"
+
+def label_samples(df):
+    """
+    Add the WaterQuality_Label and Possible_Diseases columns to a cleaned DataFrame.
+
+    Vectorised equivalent of applying water_quality_label and disease_risk_mapping
+    row by row.
+    """
+    flags = contaminant_flags(df)
+    unsafe = pd.Series(False, index=df.index)
+    diseases = pd.Series("", index=df.index)
+    for col, exceeded in flags.items():
+        unsafe |= exceeded
+        separator = (diseases != "").map({True: ", ", False: ""})
+        diseases = diseases.mask(exceeded, diseases + separator + DISEASE_RISKS[col])
+
+    df["WaterQuality_Label"] = unsafe.astype("int64")
+    df["Possible_Diseases"] = diseases.mask(diseases == "", "Safe")
+    return df
+
+def survey_arrow_table(df, float_columns=(), int_columns=()):
+    """
+    Convert a survey DataFrame to a pyarrow Table whose schema depends only on its columns.
+
+    Survey sheets switch from numbers to markers such as '-' or 'BDL' part-way
+    through a column, so every column not typed by clean_survey_data or
+    label_samples (or listed by the caller) is written as a string. Chunks of the
+    same file therefore always share one schema.
+    """
+    import pyarrow as pa
+
+    float_columns = set(NUMERIC_COLUMNS) | set(float_columns)
+    int_columns = {"WaterQuality_Label"} | set(int_columns)
+    fields, arrays = [], []
+    for col in df.columns:
+        if col in float_columns:
+            arrow_type, values = pa.float64(), df[col].astype("float64")
+        elif col in int_columns:
+            arrow_type, values = pa.int64(), df[col].astype("int64")
+        else:
+            arrow_type, values = pa.string(), df[col].astype("string")
+        fields.append(pa.field(str(col), arrow_type))
+        arrays.append(pa.array(values, type=arrow_type, from_pandas=True))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
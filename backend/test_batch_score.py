@@ -0,0 +1,54 @@
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from batch_score import ChunkWriter, read_chunks, run
+
+
+def write_in_chunks(source, output, chunk_size):
+    writer = ChunkWriter(str(output))
+    try:
+        for chunk in read_chunks(str(source), chunk_size):
+            writer.write(chunk)
+    finally:
+        writer.close()
+    return pq.read_table(output)
+
+
+def test_parquet_output_survives_column_turning_to_markers_across_chunks(tmp_path):
+    source = tmp_path / "survey.csv"
+    pd.DataFrame({
+        "Location": ["A", "B", "C", "D"],
+        "NO3": [1, 2, 3.5, None],
+        "PO4": [0, 1, "-", "BDL"],
+        "WaterQuality_Label": [0, 0, 1, 1],
+    }).to_csv(source, index=False)
+
+    table = write_in_chunks(source, tmp_path / "scored.parquet", chunk_size=2)
+
+    assert table.num_rows == 4
+    assert str(table.schema.field("NO3").type) == "double"
+    assert str(table.schema.field("PO4").type) == "string"
+    assert table.column("PO4").to_pylist() == ["0", "1", "-", "BDL"]
+    assert table.column("NO3").to_pylist()[:3] == [1.0, 2.0, 3.5]
+
+
+def test_csv_output_writes_header_once(tmp_path):
+    source = tmp_path / "survey.csv"
+    pd.DataFrame({"Location": ["A", "B", "C"], "PO4": [0, "-", 2]}).to_csv(source, index=False)
+    output = tmp_path / "scored.csv"
+
+    writer = ChunkWriter(str(output))
+    for chunk in read_chunks(str(source), chunk_size=1):
+        writer.write(chunk)
+    writer.close()
+
+    assert pd.read_csv(output, dtype=str)["PO4"].tolist() == ["0", "-", "2"]
+
+
+def test_input_outside_survey_layout_is_rejected_before_scoring(tmp_path):
+    source = tmp_path / "other.csv"
+    pd.DataFrame({"name": ["A"], "value": [1]}).to_csv(source, index=False)
+
+    with pytest.raises(ValueError, match="missing columns: NO3"):
+        run(str(source), str(tmp_path / "scored.csv"), "missing.joblib", "missing.xlsx", workers=1, chunk_size=10)
@@ -0,0 +1,90 @@
+import random
+
+import numpy as np
+import pytest
+from sklearn.cluster import DBSCAN
+
+from app import EARTH_RADIUS_KM, HotspotGrid, haversine_distance
+
+EPS_KM = 5.0
+MIN_SAMPLES = 4
+
+
+def random_points(rng):
+    # A few dense blobs over Northeast India plus scattered noise
+    points = []
+    for _ in range(rng.randint(3, 8)):
+        lat, lon = rng.uniform(23.0, 28.0), rng.uniform(90.0, 96.0)
+        spread = rng.uniform(0.01, 0.08)
+        points += [(rng.gauss(lat, spread), rng.gauss(lon, spread)) for _ in range(rng.randint(5, 40))]
+    points += [(rng.uniform(23.0, 28.0), rng.uniform(90.0, 96.0)) for _ in range(rng.randint(20, 80))]
+    return points
+
+
+def build_grid(points, order):
+    grid = HotspotGrid(eps_km=EPS_KM, min_samples=MIN_SAMPLES)
+    for original in order:
+        lat, lon = points[original]
+        grid.add_sample(lat, lon, f"village-{original}", ["NO3"])
+    return grid
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_incremental_grid_matches_dbscan(seed):
+    rng = random.Random(seed)
+    points = random_points(rng)
+    order = list(range(len(points)))
+    rng.shuffle(order)
+
+    grid = build_grid(points, order)
+    expected = DBSCAN(eps=EPS_KM / EARTH_RADIUS_KM, min_samples=MIN_SAMPLES, metric="haversine", algorithm="ball_tree")
+    labels = expected.fit_predict(np.radians(points))
+    expected_core = set(expected.core_sample_indices_)
+
+    # Grid ids are insertion positions; map them back to indices into points
+    core = {order[idx] for idx in range(len(order)) if grid.is_core[idx]}
+    assert core == expected_core
+
+    members = {}
+    for idx in range(len(order)):
+        if grid.assigned[idx]:
+            members.setdefault(grid._find(idx), set()).add(order[idx])
+
+    # Core points must be partitioned exactly as DBSCAN does
+    grid_core_partition = {frozenset(m & core) for m in members.values()}
+    expected_core_partition = {
+        frozenset(i for i in expected_core if labels[i] == label) for label in set(labels[list(expected_core)])
+    }
+    assert grid_core_partition == expected_core_partition
+
+    # Noise matches; border points may legitimately join any adjacent cluster
+    clustered = set().union(*members.values()) if members else set()
+    assert clustered == {i for i, label in enumerate(labels) if label != -1}
+    for root, cluster_members in members.items():
+        for point in cluster_members - core:
+            assert any(
+                haversine_distance(*points[point], *points[other]) <= EPS_KM for other in cluster_members & core
+            )
+
+    # Aggregates merged on union must agree with the actual members
+    assert set(grid.clusters) == set(members)
+    for root, cluster_members in members.items():
+        cluster = grid.clusters[root]
+        assert cluster["count"] == len(cluster_members)
+        assert cluster["min_lat"] == min(points[i][0] for i in cluster_members)
+        assert cluster["max_lon"] == max(points[i][1] for i in cluster_members)
+        assert set(cluster["villages"]) == {f"village-{i}" for i in cluster_members}
+
+
+def test_hotspots_report_one_entry_per_cluster():
+    rng = random.Random(0)
+    points = random_points(rng)
+    grid = build_grid(points, range(len(points)))
+
+    hotspots = grid.hotspots()
+
+    assert len(hotspots) == len(grid.clusters)
+    assert sum(h["sampleCount"] for h in hotspots) == sum(c["count"] for c in grid.clusters.values())
+    for hotspot in hotspots:
+        assert hotspot["dominantContaminant"] == "NO3"
+        assert hotspot["contaminantsExceeded"] == {"3+": 0, "2": 0, "1": hotspot["sampleCount"]}